@@ -0,0 +1,238 @@
+"""Optional Numba-compiled tick kernel.
+
+``step_kernel`` fuses wire resolution and gate evaluation into one pass over
+the flat int8 port array, stage by stage in topological order. Built on it:
+
+- ``run_kernel`` repeats it for many ticks without returning to Python;
+- ``step_kernel_parallel`` spreads wide stages over Numba's thread pool;
+- ``event_kernel`` re-evaluates only components whose inputs changed.
+
+All are None when numba is not installed; callers then stay on the NumPy
+path. Compilation is deferred to the ``warm_up*`` functions.
+"""
+from __future__ import annotations
+import heapq
+
+try:
+    from numba import get_num_threads, njit, prange, types
+except ImportError:  # numba is optional
+    njit = types = None
+
+# Kernel type ids. Port slots per component row follow the class' port order:
+#   TNOT: in, out | TAND/TNOR: in1, in2, out | Transistor: presence, sign, out
+#   TLatch: in, enable, out | TFullAdder: ai, bi, ci, so, co
+T_TNOT = 1
+T_TAND = 2
+T_TNOR = 3
+T_TRANSISTOR = 4
+T_TLATCH = 5
+T_TFULLADDER = 6
+MAX_PORTS = 5
+
+
+def _gate(pv, t, s):
+    # one component: type id t, port slot row s
+    if t == T_TNOT:
+        pv[s[1]] = -pv[s[0]]
+    elif t == T_TAND:
+        pv[s[2]] = min(pv[s[0]], pv[s[1]])
+    elif t == T_TNOR:
+        pv[s[2]] = -max(pv[s[0]], pv[s[1]])
+    elif t == T_TRANSISTOR:
+        pv[s[2]] = pv[s[1]] if pv[s[0]] != 0 else 0
+    elif t == T_TLATCH:
+        if pv[s[1]] == 1:
+            pv[s[2]] = pv[s[0]]
+    elif t == T_TFULLADDER:
+        total = pv[s[0]] + pv[s[1]] + pv[s[2]]
+        co = (total + 4) // 3 - 1
+        pv[s[4]] = co
+        pv[s[3]] = total - 3 * co
+
+
+def _reduce(pv, wire_src, wire_slot, mn_buf, mx_buf, w0, w1):
+    # min/max of drivers per multiply driven port, seeded at 0
+    for w in range(w0, w1):
+        v = pv[wire_src[w]]
+        k = wire_slot[w]
+        if v < mn_buf[k]:
+            mn_buf[k] = v
+        if v > mx_buf[k]:
+            mx_buf[k] = v
+
+
+def _step(pv, copy_src, copy_dst, wire_src, wire_slot, driven, mn_buf, mx_buf,
+          type_id, slots, copy_ptr, wire_ptr, driven_ptr, comp_ptr):
+    mn_buf[:] = 0
+    mx_buf[:] = 0
+    # stages run in topological order; *_ptr[st]:*_ptr[st + 1] is stage st
+    for st in range(comp_ptr.shape[0] - 1):
+        # 1) reduce multiply driven ports
+        _reduce(pv, wire_src, wire_slot, mn_buf, mx_buf, wire_ptr[st], wire_ptr[st + 1])
+        # 2) single-driver ports take their driver's value
+        for w in range(copy_ptr[st], copy_ptr[st + 1]):
+            pv[copy_dst[w]] = pv[copy_src[w]]
+        # 3) resolve: mn + mx (conflict => 0, else the non-zero driver if any)
+        for k in range(driven_ptr[st], driven_ptr[st + 1]):
+            pv[driven[k]] = mn_buf[k] + mx_buf[k]
+        # 4) gates
+        for c in range(comp_ptr[st], comp_ptr[st + 1]):
+            _gate(pv, type_id[c], slots[c])
+
+
+def _step_parallel(pv, copy_src, copy_dst, wire_src, wire_slot, driven, mn_buf,
+                   mx_buf, type_id, slots, copy_ptr, wire_ptr, driven_ptr,
+                   comp_ptr, min_width):
+    # Same as _step, but copies and gates of a stage with at least min_width
+    # components are split across threads. Within a stage every copy and gate
+    # writes its own ports, so the iterations are independent.
+    mn_buf[:] = 0
+    mx_buf[:] = 0
+    for st in range(comp_ptr.shape[0] - 1):
+        _reduce(pv, wire_src, wire_slot, mn_buf, mx_buf, wire_ptr[st], wire_ptr[st + 1])
+        c0 = comp_ptr[st]
+        c1 = comp_ptr[st + 1]
+        if c1 - c0 >= min_width:
+            for w in prange(copy_ptr[st], copy_ptr[st + 1]):
+                pv[copy_dst[w]] = pv[copy_src[w]]
+        else:
+            for w in range(copy_ptr[st], copy_ptr[st + 1]):
+                pv[copy_dst[w]] = pv[copy_src[w]]
+        for k in range(driven_ptr[st], driven_ptr[st + 1]):
+            pv[driven[k]] = mn_buf[k] + mx_buf[k]
+        if c1 - c0 >= min_width:
+            for c in prange(c0, c1):
+                _gate(pv, type_id[c], slots[c])
+        else:
+            for c in range(c0, c1):
+                _gate(pv, type_id[c], slots[c])
+
+
+def _run(n_ticks, sw_slots, sw_vals, probe_slots, trace, pv, copy_src, copy_dst,
+         wire_src, wire_slot, driven, mn_buf, mx_buf, type_id, slots, copy_ptr,
+         wire_ptr, driven_ptr, comp_ptr):
+    # sw_vals[t] is written to the switch outputs before tick t; trace[t]
+    # receives the probe inputs after it
+    for t in range(n_ticks):
+        for j in range(sw_slots.shape[0]):
+            pv[sw_slots[j]] = sw_vals[t, j]
+        step_kernel(pv, copy_src, copy_dst, wire_src, wire_slot, driven, mn_buf,
+                    mx_buf, type_id, slots, copy_ptr, wire_ptr, driven_ptr, comp_ptr)
+        for j in range(probe_slots.shape[0]):
+            trace[t, j] = pv[probe_slots[j]]
+
+
+def _step_events(pv, full, watch_slot, watch_prev, watch_ptr, watch_fan,
+                 row_type, row_slots, in_ptr, in_port, drv_ptr, drv_src,
+                 out_ptr, out_port, fan_ptr, fan, pending):
+    # Event-driven step for acyclic circuits. Rows are the components with a
+    # gate or driven inputs, in topological order, so fanout always points to
+    # a later row and popping the smallest pending row keeps that order.
+    heap = [0]
+    heap.pop()
+    n_rows = row_type.shape[0]
+    if full:
+        for r in range(n_rows):
+            pending[r] = True
+            heap.append(r)  # ascending, already a valid heap
+    # externally written slots (switch outputs, undriven inputs) seed events
+    for i in range(watch_slot.shape[0]):
+        v = pv[watch_slot[i]]
+        if v != watch_prev[i]:
+            watch_prev[i] = v
+            for j in range(watch_ptr[i], watch_ptr[i + 1]):
+                r = watch_fan[j]
+                if not pending[r]:
+                    pending[r] = True
+                    heapq.heappush(heap, r)
+    while len(heap) > 0:
+        r = heapq.heappop(heap)
+        pending[r] = False
+        # resolve the row's driven ports from their drivers
+        for k in range(in_ptr[r], in_ptr[r + 1]):
+            mn = 0
+            mx = 0
+            for w in range(drv_ptr[k], drv_ptr[k + 1]):
+                v = pv[drv_src[w]]
+                if v < mn:
+                    mn = v
+                if v > mx:
+                    mx = v
+            pv[in_port[k]] = mn + mx
+        t = row_type[r]
+        if t == 0:
+            continue
+        # evaluate, and wake the fanout only if an output changed (outputs
+        # are compared as one base-3 number)
+        before = 0
+        for k in range(out_ptr[r], out_ptr[r + 1]):
+            before = before * 3 + pv[out_port[k]] + 1
+        _gate(pv, t, row_slots[r])
+        after = 0
+        for k in range(out_ptr[r], out_ptr[r + 1]):
+            after = after * 3 + pv[out_port[k]] + 1
+        if after != before:
+            for j in range(fan_ptr[r], fan_ptr[r + 1]):
+                q = fan[j]
+                if not pending[q]:
+                    pending[q] = True
+                    heapq.heappush(heap, q)
+
+
+if njit is not None:
+    # helpers are compiled first so the kernels below call them natively
+    _gate = njit(inline='always')(_gate)
+    _reduce = njit(inline='always')(_reduce)
+    step_kernel = njit(cache=True, boundscheck=False)(_step)
+    step_kernel_parallel = njit(parallel=True, cache=True, boundscheck=False)(_step_parallel)
+    run_kernel = njit(cache=True, boundscheck=False)(_run)
+    event_kernel = njit(cache=True, boundscheck=False)(_step_events)
+else:
+    step_kernel = step_kernel_parallel = run_kernel = event_kernel = None
+
+
+def num_threads() -> int:
+    return get_num_threads() if njit is not None else 1
+
+
+def warm_up() -> None:
+    """Compile (or load from the on-disk cache) both kernels for their one
+    signature: int8 port values and C-contiguous intp index arrays. Further
+    specializations are then disabled, so a mistyped table raises instead of
+    silently compiling again. Called when a circuit first selects the kernel,
+    so circuits that never use it do not pay numba's compile/load time."""
+    if step_kernel.signatures:
+        return
+    vals = types.int8[::1]
+    index = types.intp[::1]
+    step_args = (vals, index, index, index, index, index, vals, vals,
+                 index, types.intp[:, ::1], index, index, index, index)
+    step_kernel.compile(types.void(*step_args))
+    run_kernel.compile(types.void(types.intp, index, types.int8[:, ::1], index,
+                                  types.int8[:, ::1], *step_args))
+    step_kernel.disable_compile()
+    run_kernel.disable_compile()
+
+
+def warm_up_parallel() -> None:
+    """As warm_up, for step_kernel_parallel (extra trailing min_width)."""
+    if step_kernel_parallel.signatures:
+        return
+    vals = types.int8[::1]
+    index = types.intp[::1]
+    step_kernel_parallel.compile(types.void(
+        vals, index, index, index, index, index, vals, vals,
+        index, types.intp[:, ::1], index, index, index, index, types.intp))
+    step_kernel_parallel.disable_compile()
+
+
+def warm_up_events() -> None:
+    """As warm_up, for event_kernel."""
+    if event_kernel.signatures:
+        return
+    index = types.intp[::1]
+    event_kernel.compile(types.void(
+        types.int8[::1], types.boolean, index, types.int8[::1], index, index,
+        index, types.intp[:, ::1], index, index, index, index,
+        index, index, index, index, types.boolean[::1]))
+    event_kernel.disable_compile()
@@ -1,11 +1,14 @@
 from __future__ import annotations
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 import json
 from .logic import Circuit, COMPONENT_REGISTRY
 
 
 def load_circuit_from_json(text: str) -> Circuit:
-    data = json.loads(text)
+    return load_circuit_from_dict(json.loads(text))
+
+
+def load_circuit_from_dict(data: Dict[str, Any]) -> Circuit:
     c = Circuit()
 
     # Create components
@@ -32,7 +35,7 @@ def load_circuit_from_json(text: str) -> Circuit:
     return c
 
 
-def dump_circuit_to_json(c: Circuit) -> str:
+def dump_circuit_to_dict(c: Circuit) -> Dict[str, Any]:
     # Minimal export (positions not tracked in core)
     comps = []
     for comp in c.components.values():
@@ -42,12 +45,8 @@ def dump_circuit_to_json(c: Circuit) -> str:
             'params': {}
         }
         # serialize switch value
-        if comp.type == 'SwitchBinary':
-            entry['params'] = {'value': comp.ports['out'].value}
-        elif comp.type == 'SwitchTernary':
+        if comp.is_switch:
             entry['params'] = {'value': comp.ports['out'].value}
-        else:
-            entry['params'] = {}
         comps.append(entry)
 
     wires = []
@@ -57,5 +56,10 @@ def dump_circuit_to_json(c: Circuit) -> str:
             'to': {'componentId': w.dst_comp, 'port': w.dst_port},
         })
 
-    data = {'name': 'Exported', 'version': 1, 'components': comps, 'wires': wires}
-    return json.dumps(data, indent=2)
+    return {'name': 'Exported', 'version': 1, 'components': comps, 'wires': wires}
+
+
+def dump_circuit_to_json(c: Circuit, *, indent: Optional[int] = 2, compact: bool = False) -> str:
+    if compact:
+        return json.dumps(dump_circuit_to_dict(c), separators=(',', ':'))
+    return json.dumps(dump_circuit_to_dict(c), indent=indent)
@@ -1,10 +1,18 @@
 from __future__ import annotations
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+from collections import OrderedDict, deque
 from dataclasses import dataclass, field
+import numpy as np
+from . import _jit, packed
 
 # Ternary values: -1, 0, 1
 TValue = int  # constrained to {-1, 0, 1}
 
+# Invariant: every port value is already in {-1, 0, 1}. Values are clamped
+# where they enter the model (switch constructors/setters, set_out, JSON load
+# via those constructors); gates only combine in-range inputs with
+# neg/min/max/select or the adder table, so they write outputs unchecked.
+
 
 def clamp_t(v: int) -> TValue:
     if v > 1:
@@ -18,28 +26,61 @@ def resolve_wire(drivers: List[TValue]) -> TValue:
     """Resolve multiple drivers on a wire.
     - if both -1 and 1 present, return 0 (conflict => null)
     - else return the unique non-zero if any, else 0
+    With min/max seeded at 0 this is just min + max: mn is -1 or 0, mx is 0 or 1,
+    and a conflict sums to 0.
     """
-    s = set(drivers)
-    if -1 in s and 1 in s:
-        return 0
-    for val in (1, -1):
-        if val in s:
-            return val
-    return 0
+    mn = 0
+    mx = 0
+    for v in drivers:
+        if v < mn:
+            mn = v
+        if v > mx:
+            mx = v
+    return mn + mx
 
 
-@dataclass
 class Port:
-    id: str
-    direction: str  # 'in' or 'out'
-    value: TValue = 0
+    """A component port.
+    Until the owning circuit is compiled the value is held locally; afterwards it
+    lives in the circuit's shared ``port_val`` array and the port keeps its slot.
+    """
+    __slots__ = ('id', 'direction', '_buf', '_idx')
+
+    def __init__(self, id: str, direction: str, value: TValue = 0):
+        self.id = id
+        self.direction = direction  # 'in' or 'out'
+        self._buf = [value]
+        self._idx = 0
+
+    @property
+    def value(self) -> TValue:
+        return int(self._buf[self._idx])
+
+    @value.setter
+    def value(self, val: TValue) -> None:
+        self._buf[self._idx] = val
+
+    def bind(self, buf, idx: int) -> None:
+        buf[idx] = self.value
+        self._buf = buf
+        self._idx = idx
+
+    def __repr__(self) -> str:
+        return f"Port(id={self.id!r}, direction={self.direction!r}, value={self.value})"
 
 
-@dataclass
+@dataclass(slots=True)
 class Component:
     id: str
     type: str
     ports: Dict[str, Port] = field(default_factory=dict)
+    # ports split by direction, in declaration order (used for layout)
+    in_ports: List[Port] = field(init=False, repr=False, default_factory=list)
+    out_ports: List[Port] = field(init=False, repr=False, default_factory=list)
+
+    def __post_init__(self):
+        self.in_ports = [p for p in self.ports.values() if p.direction == 'in']
+        self.out_ports = [p for p in self.ports.values() if p.direction == 'out']
 
     def get_in(self, name: str) -> TValue:
         return self.ports[name].value
@@ -47,11 +88,30 @@ class Component:
     def set_out(self, name: str, val: TValue) -> None:
         self.ports[name].value = clamp_t(val)
 
+    def _set_out_unchecked(self, name: str, val: TValue) -> None:
+        # for gate outputs that cannot leave {-1, 0, 1}, see the invariant above
+        self.ports[name].value = val
+
     def step(self) -> None:
         pass
 
+    # Optional type-batched kernel: step_batch(pv, idx) updates every instance
+    # of the class at once, where idx maps port name -> slot indices into pv.
+    step_batch = None
+    # Optional one-line Python template for generated step functions, with
+    # {port} fields that are replaced by the port's slot in a value list.
+    step_source = None
+    # Role flags, cheaper than isinstance checks in per-component loops
+    is_switch = False
+    is_probe = False
+    # Outputs keep their value across steps unless rewritten (latches)
+    holds_state = False
+
 
 class SwitchBinary(Component):
+    __slots__ = ('value',)
+    is_switch = True
+
     def __init__(self, id: str, value: int = 0):
         super().__init__(id, 'SwitchBinary', {
             'out': Port('out', 'out', 0)
@@ -63,8 +123,15 @@ class SwitchBinary(Component):
         self.value = 0 if self.value == 1 else 1
         self.set_out('out', self.value)
 
+    def set_value(self, value: int):
+        self.value = 1 if value != 0 else 0
+        self.set_out('out', self.value)
+
 
 class SwitchTernary(Component):
+    __slots__ = ('value',)
+    is_switch = True
+
     def __init__(self, id: str, value: int = 0):
         super().__init__(id, 'SwitchTernary', {
             'out': Port('out', 'out', 0)
@@ -74,13 +141,17 @@ class SwitchTernary(Component):
 
     def toggle(self):
         # cycle -1 -> 0 -> 1 -> -1
-        order = [-1, 0, 1]
-        idx = (order.index(self.value) + 1) % 3
-        self.value = order[idx]
+        self.value = -1 if self.value == 1 else self.value + 1
+        self.set_out('out', self.value)
+
+    def set_value(self, value: int):
+        self.value = clamp_t(value)
         self.set_out('out', self.value)
 
 
 class TNOT(Component):
+    __slots__ = ()
+
     def __init__(self, id: str):
         super().__init__(id, 'TNOT', {
             'in': Port('in', 'in', 0),
@@ -89,10 +160,18 @@ class TNOT(Component):
 
     def step(self) -> None:
         x = self.get_in('in')
-        self.set_out('out', -x)
+        self._set_out_unchecked('out', -x)
+
+    @staticmethod
+    def step_batch(pv: np.ndarray, idx: Dict[str, np.ndarray]) -> None:
+        pv[idx['out']] = -pv[idx['in']]
+
+    step_source = "{out} = -{in}"
 
 
 class TAND(Component):
+    __slots__ = ()
+
     def __init__(self, id: str):
         super().__init__(id, 'TAND', {
             'in1': Port('in1', 'in', 0),
@@ -103,10 +182,18 @@ class TAND(Component):
     def step(self) -> None:
         a = self.get_in('in1')
         b = self.get_in('in2')
-        self.set_out('out', min(a, b))
+        self._set_out_unchecked('out', min(a, b))
+
+    @staticmethod
+    def step_batch(pv: np.ndarray, idx: Dict[str, np.ndarray]) -> None:
+        pv[idx['out']] = np.minimum(pv[idx['in1']], pv[idx['in2']])
+
+    step_source = "{out} = min({in1}, {in2})"
 
 
 class TNOR(Component):
+    __slots__ = ()
+
     def __init__(self, id: str):
         super().__init__(id, 'TNOR', {
             'in1': Port('in1', 'in', 0),
@@ -117,7 +204,14 @@ class TNOR(Component):
     def step(self) -> None:
         a = self.get_in('in1')
         b = self.get_in('in2')
-        self.set_out('out', -max(a, b))
+        self._set_out_unchecked('out', -max(a, b))
+
+    @staticmethod
+    def step_batch(pv: np.ndarray, idx: Dict[str, np.ndarray]) -> None:
+        m = np.maximum(pv[idx['in1']], pv[idx['in2']])
+        pv[idx['out']] = np.negative(m, out=m)
+
+    step_source = "{out} = -max({in1}, {in2})"
 
 
 class Transistor(Component):
@@ -126,6 +220,8 @@ class Transistor(Component):
     - sign: the sign/value to pass if enabled
     Output is sign when enabled, else 0.
     """
+    __slots__ = ()
+
     def __init__(self, id: str):
         super().__init__(id, 'Transistor', {
             'presence': Port('presence', 'in', 0),
@@ -137,39 +233,71 @@ class Transistor(Component):
         p = self.get_in('presence')
         s = self.get_in('sign')
         if p != 0 and s != 0:
-            self.set_out('out', s)
+            self._set_out_unchecked('out', s)
         else:
-            self.set_out('out', 0)
+            self._set_out_unchecked('out', 0)
+
+    @staticmethod
+    def step_batch(pv: np.ndarray, idx: Dict[str, np.ndarray]) -> None:
+        # sign == 0 already yields 0, so only presence needs masking; scaling
+        # by the bool mask is a branchless select
+        pv[idx['out']] = pv[idx['sign']] * (pv[idx['presence']] != 0)
+
+    step_source = "{out} = {sign} if {presence} else 0"
 
 
 class TLatch(Component):
     """Transparent latch with enable:
     - when enable == 1: store input value
     - else: hold
+    The stored value is the output port itself, so holding is a no-op.
     """
+    __slots__ = ()
+    holds_state = True
+
     def __init__(self, id: str):
         super().__init__(id, 'TLatch', {
             'in': Port('in', 'in', 0),
             'enable': Port('enable', 'in', 0),
             'out': Port('out', 'out', 0),
         })
-        self._state: TValue = 0
 
     def step(self) -> None:
         if self.get_in('enable') == 1:
-            self._state = self.get_in('in')
-        self.set_out('out', self._state)
+            self._set_out_unchecked('out', self.get_in('in'))
+
+    @staticmethod
+    def step_batch(pv: np.ndarray, idx: Dict[str, np.ndarray]) -> None:
+        # The enable ports are the mask: only transparent latches are copied,
+        # held ones cost one compare. Early-outs on en.any()/en.all() measured
+        # slower than the masked copy at every batch size and enable ratio.
+        en = pv[idx['enable']] == 1
+        pv[idx['out'][en]] = pv[idx['in'][en]]
+
+    step_source = "if {enable} == 1: {out} = {in}"
 
 
 class Probe(Component):
+    __slots__ = ()
+    is_probe = True
+
     def __init__(self, id: str):
         super().__init__(id, 'Probe', {
             'in': Port('in', 'in', 0)
         })
-        self.last: TValue = 0
 
-    def step(self) -> None:
-        self.last = self.get_in('in')
+    @property
+    def last(self) -> TValue:
+        # the input port is only written by wire resolution during step()
+        return self.get_in('in')
+
+
+# Full adder outputs (so, co) for every total a + b + c, indexed by total + 3
+_ADDER_LUT: List[Tuple[TValue, TValue]] = []
+for _total in range(-3, 4):
+    _co = 1 if _total >= 2 else -1 if _total <= -2 else 0
+    _ADDER_LUT.append((_total - 3 * _co, _co))
+del _total, _co
 
 
 class TFullAdder(Component):
@@ -180,6 +308,8 @@ class TFullAdder(Component):
     - co (out): carry trit in {-1,0,1}
     Implements: a + b + c = so + 3*co
     """
+    __slots__ = ()
+
     def __init__(self, id: str):
         super().__init__(id, 'TFullAdder', {
             'ai': Port('ai', 'in', 0),
@@ -193,20 +323,60 @@ class TFullAdder(Component):
         a = self.get_in('ai')
         b = self.get_in('bi')
         c = self.get_in('ci')
-        total = a + b + c  # in [-3..3]
-        # nearest integer carry in {-1,0,1}
-        co = int(round(total / 3.0))
-        if co > 1:
-            co = 1
-        elif co < -1:
-            co = -1
-        so = total - 3 * co
-        # clamp for safety
-        self.set_out('co', clamp_t(co))
-        self.set_out('so', clamp_t(so))
-
-
-@dataclass
+        so, co = _ADDER_LUT[a + b + c + 3]
+        self._set_out_unchecked('co', co)
+        self._set_out_unchecked('so', so)
+
+    @staticmethod
+    def step_batch(pv: np.ndarray, idx: Dict[str, np.ndarray]) -> None:
+        total = pv[idx['ai']] + pv[idx['bi']] + pv[idx['ci']]
+        # integer form of round(total / 3) for total in [-3..3]; on arrays this
+        # is cheaper than gathering from _ADDER_LUT
+        co = (total + 4) // 3 - 1
+        pv[idx['co']] = co
+        pv[idx['so']] = total - 3 * co
+
+    step_source = "{so}, {co} = _ADDER_LUT[{ai} + {bi} + {ci} + 3]"
+
+
+# Component classes the fused Numba kernel knows how to evaluate
+_JIT_TYPE_IDS: Dict[type, int] = {
+    TNOT: _jit.T_TNOT,
+    TAND: _jit.T_TAND,
+    TNOR: _jit.T_TNOR,
+    Transistor: _jit.T_TRANSISTOR,
+    TLatch: _jit.T_TLATCH,
+    TFullAdder: _jit.T_TFULLADDER,
+}
+
+# Component classes with a SWAR kernel over packed words (see packed.py)
+_PACKED_KERNELS = {
+    TNOT: packed.tnot_batch,
+    TAND: packed.tand_batch,
+    TNOR: packed.tnor_batch,
+    Transistor: packed.transistor_batch,
+    TLatch: packed.tlatch_batch,
+    TFullAdder: packed.tfulladder_batch,
+}
+
+# Auto mode only pays the one-time JIT compile for circuits at least this big
+JIT_MIN_COMPONENTS = 256
+
+# Circuits up to this size, when not on the Numba kernel, step through a
+# generated straight-line Python function instead of per-stage NumPy calls
+# (measured break-even is around 500 components)
+CODEGEN_MAX_COMPONENTS = 256
+
+# Stages at least this wide run on Numba's thread pool when it has >1 thread
+PARALLEL_MIN_WIDTH = 4096
+
+# Step memo budget in bytes. An entry costs its port array and key plus about
+# 250 bytes of ndarray, bytes and OrderedDict bookkeeping.
+MEMO_MAX_BYTES = 16 << 20
+_MEMO_ENTRY_OVERHEAD = 256
+
+
+@dataclass(slots=True)
 class Wire:
     src_comp: str
     src_port: str
@@ -214,54 +384,566 @@ class Wire:
     dst_port: str
 
 
+def topo_levels(comp_ids: Iterable[str], wires: List[Wire]) -> Tuple[Dict[str, int], List[str]]:
+    """Assign each component its depth with Kahn's algorithm.
+    Sources get level 0, every other component one more than its deepest
+    driver. Components on a cycle, or downstream of one, never run out of
+    incoming edges; they are returned separately, in input order.
+    """
+    comps = list(comp_ids)
+    out_edges: Dict[str, set[str]] = {c: set() for c in comps}
+    in_deg: Dict[str, int] = {c: 0 for c in comps}
+    for w in wires:
+        if w.src_comp in out_edges and w.dst_comp in in_deg:
+            if w.dst_comp not in out_edges[w.src_comp]:
+                out_edges[w.src_comp].add(w.dst_comp)
+                in_deg[w.dst_comp] += 1
+    q = deque([c for c, d in in_deg.items() if d == 0])
+    level: Dict[str, int] = {c: 0 for c in q}
+    while q:
+        u = q.popleft()
+        for v in out_edges[u]:
+            in_deg[v] -= 1
+            if in_deg[v] == 0:
+                level[v] = max(level.get(v, 0), level.get(u, 0) + 1)
+                q.append(v)
+    cyclic = [c for c in comps if c not in level]
+    return level, cyclic
+
+
+@dataclass(slots=True)
+class _Stage:
+    """Components sharing one evaluation level, plus the wires into them.
+    Ports with a single driver are plain copies (copy_src -> copy_dst); only
+    ports with several drivers go through the min/max resolution."""
+    copy_src: np.ndarray
+    copy_dst: np.ndarray
+    wire_src: np.ndarray
+    wire_slot: np.ndarray
+    driven: np.ndarray
+    drv_buf: np.ndarray
+    mn_buf: np.ndarray
+    mx_buf: np.ndarray
+    batches: List[Tuple[type, Dict[str, np.ndarray]]]
+    scalar: List[Component]
+
+
+def _ptr(lengths: List[int]) -> np.ndarray:
+    return np.concatenate(([0], np.cumsum(lengths, dtype=np.intp))).astype(np.intp)
+
+
 class Circuit:
-    def __init__(self):
+    """Netlist of components and wires.
+    Simulation state is kept structure-of-arrays: every port owns one int8 slot
+    in ``port_val`` and wires are compiled into ``wire_src``/``wire_dst`` index
+    arrays, so wire resolution is a few vectorized NumPy ops per tick. Component
+    classes with a ``step_batch`` kernel are then updated one call per type,
+    level by level in topological order.
+
+    ``jit`` selects the fused Numba kernel: None uses it for large circuits when
+    numba is installed, True whenever possible, False never.
+
+    ``memo`` caches step() results for acyclic circuits of stock gates, keyed
+    by the ports a step reads but does not overwrite (switches, latch outputs,
+    unconnected inputs); a repeated state is then a lookup and a copy. It is
+    off by default: steps whose state does not repeat pay for the key.
+
+    ``incremental`` makes acyclic circuits on the Numba kernel event-driven:
+    a step re-evaluates only components downstream of switch outputs or
+    unconnected inputs that changed since the last step, stopping wherever an
+    output keeps its value. Ports written by hand other than those are not
+    noticed. It replaces the memo.
+
+    freeze() compiles up front and rejects further add/connect/remove, so the
+    compiled tables stay valid for the circuit's lifetime; the editor, which
+    rewires live, never freezes.
+    """
+    def __init__(self, jit: Optional[bool] = None, memo: bool = False,
+                 incremental: bool = False):
+        self.jit = jit
+        self.memo = memo
+        self.incremental = incremental
         self.components: Dict[str, Component] = {}
         self.wires: List[Wire] = []
+        self.port_val = np.zeros(0, dtype=np.int8)
+        self.port_index: Dict[Tuple[str, str], int] = {}
+        self.wire_src = np.zeros(0, dtype=np.intp)
+        self.wire_dst = np.zeros(0, dtype=np.intp)
+        self._dirty = True
+        self.frozen = False
+
+    def freeze(self):
+        """Compile now and lock the netlist: add, connect and remove raise
+        until unfreeze(). Switch values and stepping are unaffected."""
+        if self._dirty:
+            self._compile()
+        self.frozen = True
+
+    def unfreeze(self):
+        self.frozen = False
+
+    def _check_editable(self):
+        if self.frozen:
+            raise ValueError("Circuit is frozen; call unfreeze() to edit it")
 
     def add(self, comp: Component):
+        self._check_editable()
         if comp.id in self.components:
             raise ValueError(f"Duplicate component id {comp.id}")
         self.components[comp.id] = comp
+        self._dirty = True
 
     def connect(self, src_comp: str, src_port: str, dst_comp: str, dst_port: str):
+        # names are checked here so a bad wire fails at wiring time, not at
+        # the next compile
+        self._check_editable()
+        for cid, port in ((src_comp, src_port), (dst_comp, dst_port)):
+            comp = self.component(cid)
+            if port not in comp.ports:
+                raise ValueError(f"Component {cid} has no port {port}")
         self.wires.append(Wire(src_comp, src_port, dst_comp, dst_port))
+        self._dirty = True
+
+    def component(self, comp_id: str) -> Component:
+        """O(1) lookup by id; unknown ids raise ValueError like the rest of
+        the netlist API rather than a bare KeyError."""
+        comp = self.components.get(comp_id)
+        if comp is None:
+            raise ValueError(f"Unknown component {comp_id}")
+        return comp
+
+    def remove(self, comp_id: str):
+        """Delete a component together with every wire touching it."""
+        self._check_editable()
+        self.wires = [w for w in self.wires if w.src_comp != comp_id and w.dst_comp != comp_id]
+        self.components.pop(comp_id, None)
+        self._dirty = True
+
+    def invalidate(self):
+        """Force recompilation on the next step, e.g. after editing
+        ``components`` or ``wires`` directly."""
+        self._dirty = True
+
+    def _compile(self):
+        # 1) One int8 slot per port; ports are rebound so component code and
+        #    the GUI keep reading/writing the same storage the kernels use.
+        index: Dict[Tuple[str, str], int] = {}
+        ports: List[Port] = []
+        for comp in self.components.values():
+            for name, port in comp.ports.items():
+                index[(comp.id, name)] = len(ports)
+                ports.append(port)
+        pv = np.zeros(len(ports), dtype=np.int8)
+        for i, port in enumerate(ports):
+            port.bind(pv, i)
+        self.port_val = pv
+        self.port_index = index
+
+        # 2) Wire table as port indices
+        self.wire_src = np.array([index[(w.src_comp, w.src_port)] for w in self.wires], dtype=np.intp)
+        self.wire_dst = np.array([index[(w.dst_comp, w.dst_port)] for w in self.wires], dtype=np.intp)
+
+        # 3) One stage per topological level, so a single step() settles
+        #    acyclic logic. Components on or behind a feedback loop share a
+        #    final stage that keeps the synchronous scheme: all of its inputs
+        #    resolve from current values, then all of its components update.
+        level, cyclic = topo_levels(self.components, self.wires)
+        stage_of = dict(level)
+        n_stages = max(level.values(), default=-1) + 1
+        if cyclic:
+            for cid in cyclic:
+                stage_of[cid] = n_stages
+            n_stages += 1
+        members: List[List[Component]] = [[] for _ in range(n_stages)]
+        for comp in self.components.values():
+            members[stage_of[comp.id]].append(comp)
+        self._eval_order: List[Component] = [c for m in members for c in m]
+
+        # wires are grouped by the stage of the component they drive
+        wire_stage = np.array([stage_of[w.dst_comp] for w in self.wires], dtype=np.intp)
+        order = np.argsort(wire_stage, kind='stable')
+        bounds = np.searchsorted(wire_stage[order], np.arange(n_stages + 1))
+        self._stages: List[_Stage] = []
+        for st in range(n_stages):
+            sel = order[bounds[st]:bounds[st + 1]]
+            # a port with one driver just takes its value; the rest are
+            # compressed to the set of multiply driven ports so the min/max
+            # reductions stay dense
+            _, inv, counts = np.unique(self.wire_dst[sel], return_inverse=True, return_counts=True)
+            single = counts[inv] == 1
+            multi = sel[~single]
+            driven, slot = np.unique(self.wire_dst[multi], return_inverse=True)
+            batches, scalar = self._bucket(members[st], index)
+            self._stages.append(_Stage(
+                copy_src=self.wire_src[sel[single]],
+                copy_dst=self.wire_dst[sel[single]],
+                wire_src=self.wire_src[multi],
+                wire_slot=slot,
+                driven=driven,
+                drv_buf=np.zeros(len(multi), dtype=np.int8),
+                mn_buf=np.zeros(len(driven), dtype=np.int8),
+                mx_buf=np.zeros(len(driven), dtype=np.int8),
+                batches=batches,
+                scalar=scalar,
+            ))
+
+        # 4) Fused kernel tables: the same stages flattened into arrays, with
+        #    one row of port slots per active component and *_ptr marking
+        #    where each stage starts. Only usable when every active component
+        #    is a known type.
+        self._use_jit = False
+        self._parallel = False
+        if (_jit.step_kernel is not None and self.jit is not False and self._stages
+                and not any(st.scalar for st in self._stages)
+                and (self.jit or len(self.components) >= JIT_MIN_COMPONENTS)):
+            active = [[c for c in m if type(c).step_batch is not None] for m in members]
+            flat = [c for m in active for c in m]
+            if all(type(c) in _JIT_TYPE_IDS for c in flat):
+                slots = np.zeros((len(flat), _jit.MAX_PORTS), dtype=np.intp)
+                for row, c in enumerate(flat):
+                    for col, name in enumerate(c.ports):
+                        slots[row, col] = index[(c.id, name)]
+                offsets = _ptr([len(st.driven) for st in self._stages])
+                self._jit_args = (
+                    np.concatenate([st.copy_src for st in self._stages]),
+                    np.concatenate([st.copy_dst for st in self._stages]),
+                    np.concatenate([st.wire_src for st in self._stages]),
+                    np.concatenate([st.wire_slot + off for st, off in zip(self._stages, offsets)]),
+                    np.concatenate([st.driven for st in self._stages]),
+                    np.zeros(offsets[-1], dtype=np.int8),
+                    np.zeros(offsets[-1], dtype=np.int8),
+                    np.array([_JIT_TYPE_IDS[type(c)] for c in flat], dtype=np.intp),
+                    slots,
+                    _ptr([len(st.copy_src) for st in self._stages]),
+                    _ptr([len(st.wire_src) for st in self._stages]),
+                    offsets,
+                    _ptr([len(m) for m in active]),
+                )
+                _jit.warm_up()
+                self._use_jit = True
+                if (_jit.num_threads() > 1
+                        and max(len(m) for m in active) >= PARALLEL_MIN_WIDTH):
+                    _jit.warm_up_parallel()
+                    self._parallel = True
+
+        # 5) Small circuits: per-stage NumPy calls cost more than the gates
+        #    themselves, so emit the whole step as straight-line Python.
+        self._py_step = None
+        if (not self._use_jit and len(self.components) <= CODEGEN_MAX_COMPONENTS
+                and not any(st.scalar for st in self._stages)
+                and all(cls.step_source is not None for st in self._stages for cls, _ in st.batches)):
+            self._py_step = self._codegen(members, index)
+
+        # 6) Event-driven tables (opt-in, fused kernel and acyclic only)
+        self._events = None
+        self._events_full = True  # the first event step evaluates everything
+        if self.incremental and self._use_jit and not cyclic:
+            self._events = self._event_tables(members, index)
+            _jit.warm_up_events()
+
+        # 7) Step memo. With no feedback, a step rewrites every port except
+        #    switch outputs, latch outputs and undriven inputs, and the result
+        #    depends only on those. Custom components may hide state, so they
+        #    disable it.
+        self._memo: Optional[OrderedDict] = None
+        if (self.memo and self._events is None and not cyclic
+                and not any(st.scalar for st in self._stages)):
+            written = np.zeros(len(ports), dtype=bool)
+            written[self.wire_dst] = True
+            for comp in self.components.values():
+                cls = type(comp)
+                if cls.step_batch is not None and not cls.holds_state:
+                    for name, port in comp.ports.items():
+                        if port.direction == 'out':
+                            written[index[(comp.id, name)]] = True
+            self._state_idx = np.flatnonzero(~written)
+            self._memo = OrderedDict()
+            entry = len(ports) + len(self._state_idx) + _MEMO_ENTRY_OVERHEAD
+            self._memo_size = max(1, MEMO_MAX_BYTES // entry)
+        self._dirty = False
+
+    def _codegen(self, members: List[List[Component]], index: Dict[Tuple[str, str], int]):
+        """Build step(pv) as generated source: the port values are copied to a
+        list, each stage becomes one tuple assignment for its wires (so every
+        driver is read before any port is written) followed by one line per
+        component from its step_source, and the list is written back."""
+        lines = ['def step(pv):', '    v = pv.tolist()']
+        for st, comps in zip(self._stages, members):
+            targets = [f'v[{d}]' for d in st.copy_dst.tolist()]
+            values = [f'v[{src}]' for src in st.copy_src.tolist()]
+            drivers: List[List[str]] = [[] for _ in range(len(st.driven))]
+            for src, k in zip(st.wire_src.tolist(), st.wire_slot.tolist()):
+                drivers[k].append(f'v[{src}]')
+            for d, drv in zip(st.driven.tolist(), drivers):
+                args = ', '.join(drv)
+                targets.append(f'v[{d}]')
+                values.append(f'min(0, {args}) + max(0, {args})')
+            if targets:
+                lines.append(f"    {', '.join(targets)} = {', '.join(values)}")
+            for comp in comps:
+                src = type(comp).step_source
+                if src is not None:
+                    slots = {name: f'v[{index[(comp.id, name)]}]' for name in comp.ports}
+                    lines.append('    ' + src.format(**slots))
+        lines.append('    pv[:] = v')
+        namespace = {'_ADDER_LUT': _ADDER_LUT}
+        exec('\n'.join(lines), namespace)
+        return namespace['step']
+
+    def _event_tables(self, members: List[List[Component]], index: Dict[Tuple[str, str], int]):
+        """Arguments for _jit.event_kernel after pv and the full flag. Rows are
+        the components with a gate or a driven port, in stage order; per row
+        the driven ports and their drivers, the output ports and the rows fed
+        by them (CSR: *_ptr[r]:*_ptr[r + 1]). Slots written from outside, i.e.
+        driven by passive components or unconnected gate inputs, are watched
+        for changes and wake their own fanout."""
+        drivers: Dict[int, List[int]] = {}
+        for src, dst in zip(self.wire_src.tolist(), self.wire_dst.tolist()):
+            drivers.setdefault(dst, []).append(src)
+        owner = {slot: cid for (cid, _), slot in index.items()}
+        rows: List[Component] = []
+        row_of: Dict[str, int] = {}
+        for m in members:
+            for comp in m:
+                active = type(comp).step_batch is not None
+                if active or any(index[(comp.id, name)] in drivers for name in comp.ports):
+                    row_of[comp.id] = len(rows)
+                    rows.append(comp)
+        fan: List[set] = [set() for _ in rows]
+        watch: Dict[int, set] = {}
+        for src, dst in zip(self.wire_src.tolist(), self.wire_dst.tolist()):
+            r = row_of[owner[dst]]
+            src_comp = self.components[owner[src]]
+            if type(src_comp).step_batch is not None:
+                fan[row_of[src_comp.id]].add(r)
+            else:
+                watch.setdefault(src, set()).add(r)
+        in_ports: List[List[int]] = []
+        out_ports: List[List[int]] = []
+        slots = np.zeros((len(rows), _jit.MAX_PORTS), dtype=np.intp)
+        for r, comp in enumerate(rows):
+            active = type(comp).step_batch is not None
+            ins, outs = [], []
+            for col, (name, port) in enumerate(comp.ports.items()):
+                slot = index[(comp.id, name)]
+                slots[r, col] = slot
+                if slot in drivers:
+                    ins.append(slot)
+                elif active and port.direction == 'in':
+                    watch.setdefault(slot, set()).add(r)
+                if active and port.direction == 'out':
+                    outs.append(slot)
+            in_ports.append(ins)
+            out_ports.append(outs)
+        watch_slot = np.array(sorted(watch), dtype=np.intp)
+        watch_fan = [sorted(watch[w]) for w in watch_slot.tolist()]
+        flat_in = [p for ins in in_ports for p in ins]
+        return (
+            watch_slot,
+            self.port_val[watch_slot],
+            _ptr([len(f) for f in watch_fan]),
+            np.array([r for f in watch_fan for r in f], dtype=np.intp),
+            np.array([_JIT_TYPE_IDS.get(type(c), 0) for c in rows], dtype=np.intp),
+            slots,
+            _ptr([len(ins) for ins in in_ports]),
+            np.array(flat_in, dtype=np.intp),
+            _ptr([len(drivers[p]) for p in flat_in]),
+            np.array([src for p in flat_in for src in drivers[p]], dtype=np.intp),
+            _ptr([len(outs) for outs in out_ports]),
+            np.array([p for outs in out_ports for p in outs], dtype=np.intp),
+            _ptr([len(f) for f in fan]),
+            np.array([r for f in fan for r in sorted(f)], dtype=np.intp),
+            np.zeros(len(rows), dtype=bool),
+        )
+
+    @staticmethod
+    def _bucket(comps: List[Component], index: Dict[Tuple[str, str], int]):
+        # Batched classes get per-port index arrays, the rest are stepped one
+        # by one. Classes that do not override step() (switches, probes) need
+        # no work per tick.
+        buckets: Dict[type, List[Component]] = {}
+        scalar: List[Component] = []
+        for comp in comps:
+            cls = type(comp)
+            if cls.step_batch is not None:
+                buckets.setdefault(cls, []).append(comp)
+            elif cls.step is not Component.step:
+                scalar.append(comp)
+        batches = []
+        for cls, members in buckets.items():
+            idx = {name: np.array([index[(c.id, name)] for c in members], dtype=np.intp)
+                   for name in members[0].ports}
+            batches.append((cls, idx))
+        return batches, scalar
 
     def step(self):
-        # 1) Collect drivers for each input port
-        inputs: Dict[Tuple[str, str], List[TValue]] = {}
-        for w in self.wires:
-            src = self.components[w.src_comp]
-            val = src.ports[w.src_port].value
-            key = (w.dst_comp, w.dst_port)
-            inputs.setdefault(key, []).append(val)
-
-        # 2) Resolve and write into input ports
-        for (comp_id, port_name), drivers in inputs.items():
-            comp = self.components[comp_id]
-            comp.ports[port_name].value = resolve_wire(drivers)
-
-        # 3) Step all components (which update outputs)
-        for comp in self.components.values():
-            comp.step()
+        if self._dirty:
+            self._compile()
+        memo = self._memo
+        if memo is None:
+            self._step()
+            return
+        pv = self.port_val
+        key = pv[self._state_idx].tobytes()
+        hit = memo.get(key)
+        if hit is not None:
+            memo.move_to_end(key)
+            pv[:] = hit
+            return
+        self._step()
+        memo[key] = pv.copy()
+        if len(memo) > self._memo_size:
+            memo.popitem(last=False)
+
+    def _step(self):
+        pv = self.port_val
+        if self._events is not None:
+            _jit.event_kernel(pv, self._events_full, *self._events)
+            self._events_full = False
+            return
+        if self._parallel:
+            _jit.step_kernel_parallel(pv, *self._jit_args, PARALLEL_MIN_WIDTH)
+            return
+        if self._use_jit:
+            _jit.step_kernel(pv, *self._jit_args)
+            return
+        if self._py_step is not None:
+            self._py_step(pv)
+            return
+
+        for st in self._stages:
+            # 1) Single-driver ports copy their driver; for the others reduce
+            #    drivers to min/max seeded at 0 and resolve as mn + mx (see
+            #    resolve_wire). Drivers are all read before any port is written.
+            if st.driven.size:
+                # mode='clip' lets take() write straight into the buffer (the
+                # default 'raise' stages through a temporary); slots are
+                # always in range
+                drivers = pv.take(st.wire_src, out=st.drv_buf, mode='clip')
+            if st.copy_dst.size:
+                pv[st.copy_dst] = pv[st.copy_src]
+            if st.driven.size:
+                mn = st.mn_buf
+                mx = st.mx_buf
+                mn.fill(0)
+                mx.fill(0)
+                np.minimum.at(mn, st.wire_slot, drivers)
+                np.maximum.at(mx, st.wire_slot, drivers)
+                pv[st.driven] = np.add(mn, mx, out=mn)
+
+            # 2) Update outputs: one kernel call per batched type, then the rest
+            for cls, idx in st.batches:
+                cls.step_batch(pv, idx)
+            for comp in st.scalar:
+                comp.step()
 
     def set_switch(self, comp_id: str, value: int):
-        c = self.components[comp_id]
-        if isinstance(c, SwitchBinary):
-            c.value = 1 if value != 0 else 0
-            c.set_out('out', c.value)
-        elif isinstance(c, SwitchTernary):
-            c.value = clamp_t(value)
-            c.set_out('out', c.value)
-        else:
+        c = self.component(comp_id)
+        if not c.is_switch:
             raise ValueError("Component is not a switch")
+        c.set_value(value)
 
     def get_probe(self, comp_id: str) -> TValue:
-        c = self.components[comp_id]
-        if not isinstance(c, Probe):
+        c = self.component(comp_id)
+        if not c.is_probe:
             raise ValueError("Component is not a probe")
         return c.last
 
+    def _switch_columns(self, inputs: Dict[str, Sequence[int]], n: int):
+        """Output slots of the given switches and their values, coerced as
+        set_switch does, as an int8 array of shape (switches, n). Each switch
+        needs exactly n values."""
+        sw_slots = np.empty(len(inputs), dtype=np.intp)
+        sw_vals = np.zeros((len(inputs), n), dtype=np.int8)
+        for row, (cid, values) in enumerate(inputs.items()):
+            c = self.component(cid)
+            col = np.asarray(values)
+            if not c.is_switch:
+                raise ValueError("Component is not a switch")
+            if col.shape != (n,):
+                raise ValueError(f"Switch {cid} has {col.size} values, expected {n}")
+            sw_vals[row] = col != 0 if isinstance(c, SwitchBinary) else np.clip(col, -1, 1)
+            sw_slots[row] = self.port_index[(cid, 'out')]
+        return sw_slots, sw_vals
+
+    def _probe_slots(self, probes: List[str]) -> np.ndarray:
+        for pid in probes:
+            if not self.component(pid).is_probe:
+                raise ValueError("Component is not a probe")
+        return np.array([self.port_index[(pid, 'in')] for pid in probes], dtype=np.intp)
+
+    def run(self, n_ticks: int, inputs: Optional[Dict[str, Sequence[int]]] = None,
+            probes: Optional[List[str]] = None) -> np.ndarray:
+        """Advance the circuit n_ticks steps and return the probe trace as int8
+        of shape (n_ticks, probes); row t holds the probes after step t.
+        ``inputs`` optionally maps switch ids to one value per tick, applied
+        before that tick; ``probes`` defaults to every probe in the circuit.
+        With the Numba kernel the whole loop runs without returning to Python.
+        """
+        if self._dirty:
+            self._compile()
+        inputs = inputs or {}
+        if probes is None:
+            probes = [cid for cid, c in self.components.items() if c.is_probe]
+        sw_slots, sw_vals = self._switch_columns(inputs, n_ticks)
+        probe_slots = self._probe_slots(probes)
+        trace = np.empty((n_ticks, len(probe_slots)), dtype=np.int8)
+        pv = self.port_val
+        if self._use_jit:
+            _jit.run_kernel(n_ticks, sw_slots, np.ascontiguousarray(sw_vals.T),
+                            probe_slots, trace, pv, *self._jit_args)
+            self._events_full = True  # bypassed the event bookkeeping
+        else:
+            for t in range(n_ticks):
+                pv[sw_slots] = sw_vals[:, t]
+                self.step()
+                trace[t] = pv[probe_slots]
+        if n_ticks:
+            for cid in inputs:
+                c = self.components[cid]
+                c.value = c.ports['out'].value
+        return trace
+
+    def sweep(self, inputs: Dict[str, Sequence[int]], probes: List[str]) -> np.ndarray:
+        """Evaluate one step per input pattern, each from the current state.
+        ``inputs`` maps switch ids to one value per pattern, the same number
+        for every switch; returns the probe values as int8 of shape
+        (patterns, probes). The circuit's own state is
+        left untouched. Circuits built from the stock gates evaluate 32
+        patterns per uint64 word; custom components fall back to one step per
+        pattern.
+        """
+        if self._dirty:
+            self._compile()
+        pv = self.port_val
+        # the first switch sets the pattern count; the others must match it
+        n = len(next(iter(inputs.values()))) if inputs else 1
+        sw_slots, sw_vals = self._switch_columns(inputs, n)
+        probe_slots = self._probe_slots(probes)
+
+        if all(not st.scalar and all(cls in _PACKED_KERNELS for cls, _ in st.batches)
+               for st in self._stages):
+            # every port becomes a row of words, lanes seeded with its value
+            words = packed.pack(np.repeat(pv[:, None], n, axis=1))
+            words[sw_slots] = packed.pack(sw_vals)
+            for st in self._stages:
+                resolved = packed.resolve(words[st.wire_src], st.wire_slot, len(st.driven))
+                words[st.copy_dst] = words[st.copy_src]
+                words[st.driven] = resolved
+                for cls, idx in st.batches:
+                    _PACKED_KERNELS[cls](words, idx)
+            return packed.unpack(words[probe_slots], n).T
+
+        saved = pv.copy()
+        out = np.empty((n, len(probe_slots)), dtype=np.int8)
+        for i in range(n):
+            pv[sw_slots] = sw_vals[:, i]
+            self.step()
+            out[i] = pv[probe_slots]
+            pv[:] = saved
+            self._events_full = True  # restored behind the event tables' back
+        return out
+
 
 COMPONENT_REGISTRY = {
     'SwitchBinary': SwitchBinary,
@@ -0,0 +1,124 @@
+"""Ternary values packed 32 to a uint64 word (SWAR).
+
+Each trit takes a 2-bit lane holding ``v & 3``: 00 = 0, 01 = +1, 11 = -1.
+The low bit of a lane is "non-zero", the high bit "negative", so min/max/neg
+become a few bitwise ops on whole words, 32 lanes at a time.
+"""
+from __future__ import annotations
+from typing import Dict
+import numpy as np
+
+LANES = 32
+_LO = np.uint64(0x5555555555555555)  # low bit of every lane
+_ONE = np.uint64(1)
+_SHIFTS = (2 * np.arange(LANES)).astype(np.uint64)
+_DECODE = np.array([0, 1, 0, -1], dtype=np.int8)  # code 2 is unused
+
+
+def pack(values: np.ndarray) -> np.ndarray:
+    """Pack int8 trits along the last axis into ceil(n / 32) words."""
+    values = np.asarray(values, dtype=np.int8)
+    n = values.shape[-1]
+    n_words = -(-n // LANES)
+    codes = np.zeros(values.shape[:-1] + (n_words * LANES,), dtype=np.uint64)
+    codes[..., :n] = values.astype(np.uint8) & 3
+    codes = codes.reshape(values.shape[:-1] + (n_words, LANES)) << _SHIFTS
+    return np.bitwise_or.reduce(codes, axis=-1)
+
+
+def unpack(words: np.ndarray, n: int) -> np.ndarray:
+    """Inverse of pack: the first n trits along the last axis, as int8."""
+    codes = (words[..., None] >> _SHIFTS) & np.uint64(3)
+    flat = codes.reshape(words.shape[:-1] + (words.shape[-1] * LANES,))[..., :n]
+    return _DECODE[flat]
+
+
+def _planes(w: np.ndarray):
+    neg = (w >> _ONE) & _LO
+    return (w & _LO) ^ neg, neg  # (positive, negative)
+
+
+def _join(pos: np.ndarray, neg: np.ndarray) -> np.ndarray:
+    return pos | neg | (neg << _ONE)
+
+
+def _widen(bits: np.ndarray) -> np.ndarray:
+    # a per-lane flag in the low bit -> full 2-bit lane mask
+    return bits | (bits << _ONE)
+
+
+def tneg(w: np.ndarray) -> np.ndarray:
+    pos, neg = _planes(w)
+    return _join(neg, pos)
+
+
+def tmin(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    pa, na = _planes(a)
+    pb, nb = _planes(b)
+    return _join(pa & pb, na | nb)
+
+
+def tmax(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    pa, na = _planes(a)
+    pb, nb = _planes(b)
+    return _join(pa | pb, na & nb)
+
+
+def tsel(mask: np.ndarray, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Lane-wise a where mask (full 2-bit lanes set), else b."""
+    return (a & mask) | (b & ~mask)
+
+
+def _half_add(pa, na, pb, nb):
+    # a + b = s + 3c over planes: s wraps +-2 to -+1, carrying the sign
+    za = _LO & ~(pa | na)
+    zb = _LO & ~(pb | nb)
+    ps = (pa & zb) | (za & pb) | (na & nb)
+    ns = (na & zb) | (za & nb) | (pa & pb)
+    return ps, ns, pa & pb, na & nb
+
+
+def resolve(drivers: np.ndarray, slot: np.ndarray, n_driven: int) -> np.ndarray:
+    """Packed wire resolution: OR the positive and negative planes of all
+    drivers per destination slot; lanes seeing both resolve to 0."""
+    pos, neg = _planes(drivers)
+    acc_pos = np.zeros((n_driven,) + drivers.shape[1:], dtype=np.uint64)
+    acc_neg = np.zeros_like(acc_pos)
+    np.bitwise_or.at(acc_pos, slot, pos)
+    np.bitwise_or.at(acc_neg, slot, neg)
+    return _join(acc_pos & ~acc_neg, acc_neg & ~acc_pos)
+
+
+# Gate kernels over packed port words, same (words, idx) shape as step_batch
+def tnot_batch(words: np.ndarray, idx: Dict[str, np.ndarray]) -> None:
+    words[idx['out']] = tneg(words[idx['in']])
+
+
+def tand_batch(words: np.ndarray, idx: Dict[str, np.ndarray]) -> None:
+    words[idx['out']] = tmin(words[idx['in1']], words[idx['in2']])
+
+
+def tnor_batch(words: np.ndarray, idx: Dict[str, np.ndarray]) -> None:
+    words[idx['out']] = tneg(tmax(words[idx['in1']], words[idx['in2']]))
+
+
+def transistor_batch(words: np.ndarray, idx: Dict[str, np.ndarray]) -> None:
+    pos, neg = _planes(words[idx['presence']])
+    words[idx['out']] = words[idx['sign']] & _widen(pos | neg)
+
+
+def tlatch_batch(words: np.ndarray, idx: Dict[str, np.ndarray]) -> None:
+    en, _ = _planes(words[idx['enable']])
+    words[idx['out']] = tsel(_widen(en), words[idx['in']], words[idx['out']])
+
+
+def tfulladder_batch(words: np.ndarray, idx: Dict[str, np.ndarray]) -> None:
+    # two half adders; co = c1 + c2 never overflows, opposite carries cancel
+    pa, na = _planes(words[idx['ai']])
+    pb, nb = _planes(words[idx['bi']])
+    pc, nc = _planes(words[idx['ci']])
+    p1, n1, pc1, nc1 = _half_add(pa, na, pb, nb)
+    ps, ns, pc2, nc2 = _half_add(p1, n1, pc, nc)
+    words[idx['so']] = _join(ps, ns)
+    pco, nco = pc1 | pc2, nc1 | nc2
+    words[idx['co']] = _join(pco & ~nco, nco & ~pco)
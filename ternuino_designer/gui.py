@@ -1,13 +1,45 @@
 from __future__ import annotations
-from typing import Dict, Optional
+from typing import Dict, Optional, Tuple
 import json
 from PySide6 import QtCore, QtGui, QtWidgets
-from .core.logic import Circuit, COMPONENT_REGISTRY, SwitchBinary, SwitchTernary, Probe
-from .core.io import load_circuit_from_json, dump_circuit_to_json
+from .core.logic import Circuit, COMPONENT_REGISTRY, topo_levels
+from .core.io import load_circuit_from_dict, dump_circuit_to_dict
 
 PORT_RADIUS = 6
 COMP_WIDTH = 100
 COMP_HEIGHT = 50
+GRID_CELL = 128  # spatial hash cell size for hit-testing
+
+# Paint resources, built once instead of per component/port on every paint
+BG_COLOR = QtGui.QColor("#1e1e1e")
+COMP_BRUSH = QtGui.QBrush(QtGui.QColor("#2e2e2e"))
+SELECT_PEN = QtGui.QPen(QtGui.QColor("#4FC3F7"), 2)  # cyan
+UNWIRED_PEN = QtGui.QPen(QtGui.QColor("#FFC107"), 2)  # amber warning
+NORMAL_PEN = QtGui.QPen(QtGui.QColor("#aaa"), 1)
+TEXT_PEN = QtGui.QPen(QtGui.QColor("#fff"), 1)
+PORT_PEN = QtGui.QPen(QtGui.QColor("#000"), 1)
+PORT_BRUSH = {
+    1: QtGui.QBrush(QtGui.QColor("#00e676")),
+    0: QtGui.QBrush(QtGui.QColor("#9e9e9e")),
+    -1: QtGui.QBrush(QtGui.QColor("#ff5252")),
+}
+WIRE_PEN = QtGui.QPen(QtGui.QColor("#888"), 2)
+
+
+def _line_bounds(a: QtCore.QPointF, b: QtCore.QPointF) -> QtCore.QRectF:
+    # widened by the wire pen so antialiased edges are repainted too
+    return QtCore.QRectF(a, b).normalized().adjusted(-2, -2, 2, 2)
+
+
+def _cells(r: QtCore.QRectF):
+    """Grid cells overlapped by a rect."""
+    for gx in range(int(r.left() // GRID_CELL), int(r.right() // GRID_CELL) + 1):
+        for gy in range(int(r.top() // GRID_CELL), int(r.bottom() // GRID_CELL) + 1):
+            yield gx, gy
+
+
+def _cell(pos: QtCore.QPointF) -> tuple[int, int]:
+    return int(pos.x() // GRID_CELL), int(pos.y() // GRID_CELL)
 
 
 class Canvas(QtWidgets.QWidget):
@@ -24,6 +56,13 @@ class Canvas(QtWidgets.QWidget):
         self.pending_add: Optional[str] = None
         self.selected: Optional[str] = None
         self.unwired: Dict[str, list[str]] = {}
+        # last rendered visual per component id, with the key (everything
+        # that affects it) it was drawn for
+        self._pic_cache: Dict[str, Tuple[tuple, QtGui.QPicture]] = {}
+        self._drag_wires: list = []
+        # spatial hash of component bodies and port rects for hit-testing
+        self._grid: Dict[tuple[int, int], list[str]] = {}
+        self._port_grid: Dict[tuple[int, int], list[tuple[str, str]]] = {}
         # Ensure initial virtual canvas size is reasonable for scrolling
         self.update_extents()
 
@@ -36,6 +75,7 @@ class Canvas(QtWidgets.QWidget):
         comp = cls(cid, 0) if ctype.startswith("Switch") else cls(cid)
         self.circuit.add(comp)
         self.positions[cid] = QtCore.QPointF(pos)
+        self._rebuild_index()
         self.update_extents()
         self.update()
 
@@ -44,11 +84,10 @@ class Canvas(QtWidgets.QWidget):
         self.setCursor(QtCore.Qt.CrossCursor if ctype else QtCore.Qt.ArrowCursor)
 
     def load_json(self, text: str):
-        try:
-            data = json.loads(text)
-        except Exception:
-            data = {"components": [], "wires": []}
-        self.circuit = load_circuit_from_json(text)
+        # parse once; the same dict feeds the circuit and the saved positions
+        data = json.loads(text)
+        self.circuit = load_circuit_from_dict(data)
+        self._pic_cache.clear()
         # place with saved positions if present
         x, y = 100, 100
         saved: Dict[str, QtCore.QPointF] = {}
@@ -68,50 +107,29 @@ class Canvas(QtWidgets.QWidget):
                     y += 120
         # validate on load
         self.validate_wiring()
+        self._rebuild_index()
         self.update_extents()
         self.update()
 
     def auto_arrange(self):
-        # Build graph
-        comps = list(self.circuit.components.keys())
-        out_edges: Dict[str, set[str]] = {c: set() for c in comps}
-        in_deg: Dict[str, int] = {c: 0 for c in comps}
-        for w in self.circuit.wires:
-            if w.src_comp in out_edges and w.dst_comp in in_deg:
-                if w.dst_comp not in out_edges[w.src_comp]:
-                    out_edges[w.src_comp].add(w.dst_comp)
-                    in_deg[w.dst_comp] += 1
         # Kahn's algorithm to assign levels
-        from collections import deque, defaultdict
-        q = deque([c for c, d in in_deg.items() if d == 0])
-        level: Dict[str, int] = {c: 0 for c in q}
-        while q:
-            u = q.popleft()
-            for v in out_edges[u]:
-                in_deg[v] -= 1
-                if in_deg[v] == 0:
-                    level[v] = max(level.get(v, 0), level.get(u, 0) + 1)
-                    q.append(v)
+        comps = list(self.circuit.components.keys())
+        level, cyclic = topo_levels(comps, self.circuit.wires)
         # any remaining nodes (cycle): place after max level
         max_lvl = max(level.values(), default=0)
-        for c, d in in_deg.items():
-            if d > 0 and c not in level:
-                max_lvl += 1
-                level[c] = max_lvl
-        # group by level
-        by_lvl: Dict[int, list[str]] = defaultdict(list)
-        for cid, lv in level.items():
-            by_lvl[lv].append(cid)
-        # stable order: use existing positions to keep relative nearby
-        for lv in by_lvl:
-            by_lvl[lv].sort()
-        # assign positions
+        for c in cyclic:
+            max_lvl += 1
+            level[c] = max_lvl
+        # assign positions in one scan ordered by (level, id): a column per
+        # level, rows in id order
         x0, y0 = 120, 100
         xgap, ygap = 200, 120
         new_pos: Dict[str, QtCore.QPointF] = {}
-        for lv in sorted(by_lvl.keys()):
-            for i, cid in enumerate(by_lvl[lv]):
-                new_pos[cid] = QtCore.QPointF(x0 + lv * xgap, y0 + i * ygap)
+        prev_lvl, i = None, 0
+        for cid, lv in sorted(level.items(), key=lambda kv: (kv[1], kv[0])):
+            i = i + 1 if lv == prev_lvl else 0
+            prev_lvl = lv
+            new_pos[cid] = QtCore.QPointF(x0 + lv * xgap, y0 + i * ygap)
         # include any components that somehow missed (empty graph)
         for cid in comps:
             if cid not in new_pos:
@@ -119,10 +137,13 @@ class Canvas(QtWidgets.QWidget):
         self.positions = new_pos
         # Update wiring highlights as layout changed
         self.validate_wiring()
+        self._rebuild_index()
         self.update_extents()
         self.update()
 
     def validate_wiring(self) -> Dict[str, list[str]]:
+        # the netlist may have changed; recompile before the next step
+        self.circuit.invalidate()
         incoming = {}
         outgoing = {}
         for w in self.circuit.wires:
@@ -146,59 +167,82 @@ class Canvas(QtWidgets.QWidget):
 
     def paintEvent(self, event):
         p = QtGui.QPainter(self)
-        p.fillRect(self.rect(), QtGui.QColor("#1e1e1e"))
+        p.fillRect(event.rect(), BG_COLOR)
         p.setRenderHint(QtGui.QPainter.Antialiasing)
-        # components (populate port_map first so wires use current positions)
-        self.port_map.clear()
+        clip = QtCore.QRectF(event.rect())
+        # components
         for cid, comp in self.circuit.components.items():
-            pos = self.positions.get(cid, QtCore.QPointF(50, 50))
-            rect = QtCore.QRectF(pos.x(), pos.y(), COMP_WIDTH, COMP_HEIGHT)
-            p.setBrush(QtGui.QColor("#2e2e2e"))
-            # selected > unwired > normal
-            if cid == self.selected:
-                border_color = "#4FC3F7"  # cyan
-                width = 2
-            elif cid in self.unwired:
-                border_color = "#FFC107"  # amber warning
-                width = 2
-            else:
-                border_color = "#aaa"
-                width = 1
-            p.setPen(QtGui.QPen(QtGui.QColor(border_color), width))
-            p.drawRoundedRect(rect, 6, 6)
-            p.setPen(QtGui.QPen(QtGui.QColor("#fff"), 1))
-            p.drawText(rect.adjusted(4, 4, -4, -4), QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop, f"{comp.type}\n{cid}")
-            # ports
-            in_ports = [p2 for p2 in comp.ports.values() if p2.direction == "in"]
-            out_ports = [p2 for p2 in comp.ports.values() if p2.direction == "out"]
-            for i, prt in enumerate(in_ports):
-                cx = rect.left() - 12
-                cy = rect.top() + 15 + i * 18
-                self.draw_port(p, cx, cy, cid, prt.id)
-            for i, prt in enumerate(out_ports):
-                cx = rect.right() + 12
-                cy = rect.top() + 15 + i * 18
-                self.draw_port(p, cx, cy, cid, prt.id)
-            # overlays
-            if isinstance(comp, (SwitchBinary, SwitchTernary)):
-                p.drawText(rect.adjusted(4, 24, -4, -4), QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop, f"val={comp.ports['out'].value}")
-            if isinstance(comp, Probe):
-                p.drawText(rect.adjusted(4, 24, -4, -4), QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop, f"in={comp.ports['in'].value}")
+            if self._comp_bounds(cid).intersects(clip):
+                pos = self.positions.get(cid, QtCore.QPointF(50, 50))
+                p.drawPicture(pos, self._render_component(cid, comp))
 
         # wires (draw after components so endpoints align with current ports)
-        p.setPen(QtGui.QPen(QtGui.QColor("#888"), 2))
+        p.setPen(WIRE_PEN)
         for w in self.circuit.wires:
             a = self.port_center(w.src_comp, w.src_port, True)
             b = self.port_center(w.dst_comp, w.dst_port, False)
-            p.drawLine(a, b)
-
-    def draw_port(self, p: QtGui.QPainter, cx: float, cy: float, cid: str, port: str):
-        r = QtCore.QRectF(cx - PORT_RADIUS, cy - PORT_RADIUS, PORT_RADIUS * 2, PORT_RADIUS * 2)
-        val = self.circuit.components[cid].ports[port].value
-        p.setBrush(QtGui.QColor({1: "#00e676", 0: "#9e9e9e", -1: "#ff5252"}[val]))
-        p.setPen(QtGui.QPen(QtGui.QColor("#000"), 1))
+            if _line_bounds(a, b).intersects(clip):
+                p.drawLine(a, b)
+
+    def _render_component(self, cid: str, comp) -> QtGui.QPicture:
+        """Component body, ports and overlays drawn at the origin; redrawn only
+        when the component's key changes."""
+        selected = cid == self.selected
+        unwired = cid in self.unwired
+        key = (comp.type, selected, unwired, tuple(prt.value for prt in comp.ports.values()))
+        cached = self._pic_cache.get(cid)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        pic = QtGui.QPicture()
+        p = QtGui.QPainter(pic)
+        p.setRenderHint(QtGui.QPainter.Antialiasing)
+        p.setFont(self.font())
+        origin = QtCore.QPointF(0, 0)
+        rect = QtCore.QRectF(0, 0, COMP_WIDTH, COMP_HEIGHT)
+        p.setBrush(COMP_BRUSH)
+        # selected > unwired > normal
+        if selected:
+            p.setPen(SELECT_PEN)
+        elif unwired:
+            p.setPen(UNWIRED_PEN)
+        else:
+            p.setPen(NORMAL_PEN)
+        p.drawRoundedRect(rect, 6, 6)
+        p.setPen(TEXT_PEN)
+        p.drawText(rect.adjusted(4, 4, -4, -4), QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop, f"{comp.type}\n{cid}")
+        # ports
+        for i, prt in enumerate(comp.in_ports):
+            self.draw_port(p, self._port_rect(origin, i, False), prt.value)
+        for i, prt in enumerate(comp.out_ports):
+            self.draw_port(p, self._port_rect(origin, i, True), prt.value)
+        # overlays
+        if comp.is_switch:
+            p.drawText(rect.adjusted(4, 24, -4, -4), QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop, f"val={comp.ports['out'].value}")
+        if comp.is_probe:
+            p.drawText(rect.adjusted(4, 24, -4, -4), QtCore.Qt.AlignLeft | QtCore.Qt.AlignTop, f"in={comp.ports['in'].value}")
+        p.end()
+        self._pic_cache[cid] = (key, pic)
+        return pic
+
+    @staticmethod
+    def _port_rect(pos: QtCore.QPointF, i: int, output: bool) -> QtCore.QRectF:
+        cx = pos.x() + (COMP_WIDTH + 12 if output else -12)
+        cy = pos.y() + 15 + i * 18
+        return QtCore.QRectF(cx - PORT_RADIUS, cy - PORT_RADIUS, PORT_RADIUS * 2, PORT_RADIUS * 2)
+
+    def _comp_bounds(self, cid: str) -> QtCore.QRectF:
+        """Area a component paints, including its ports and border pen."""
+        comp = self.circuit.components[cid]
+        pos = self.positions.get(cid, QtCore.QPointF(50, 50))
+        n = max(len(comp.in_ports), len(comp.out_ports), 1)
+        height = max(COMP_HEIGHT, 15 + (n - 1) * 18 + PORT_RADIUS)
+        margin = 12 + PORT_RADIUS + 2
+        return QtCore.QRectF(pos.x() - margin, pos.y() - 2, COMP_WIDTH + 2 * margin, height + 4)
+
+    def draw_port(self, p: QtGui.QPainter, r: QtCore.QRectF, val: int):
+        p.setBrush(PORT_BRUSH[val])
+        p.setPen(PORT_PEN)
         p.drawEllipse(r)
-        self.port_map[(cid, port)] = r
 
     def port_center(self, cid: str, port: str, output: bool) -> QtCore.QPointF:
         r = self.port_map.get((cid, port))
@@ -209,66 +253,129 @@ class Canvas(QtWidgets.QWidget):
 
     def mousePressEvent(self, e: QtGui.QMouseEvent):
         pos = e.position()
+        hit = self._component_at(pos)
         # placement
-        if self.pending_add:
-            for _, p in self.positions.items():
-                if QtCore.QRectF(p.x(), p.y(), COMP_WIDTH, COMP_HEIGHT).contains(pos):
-                    break
-            else:
-                self.add_component(self.pending_add, pos)
-                self.pending_add = None
-                self.setCursor(QtCore.Qt.ArrowCursor)
-                return
+        if self.pending_add and hit is None:
+            self.add_component(self.pending_add, pos)
+            self.pending_add = None
+            self.setCursor(QtCore.Qt.ArrowCursor)
+            return
         # inside component rect => select/toggle/context menu
-        for cid, comp in self.circuit.components.items():
-            rect = QtCore.QRectF(self.positions[cid].x(), self.positions[cid].y(), COMP_WIDTH, COMP_HEIGHT)
-            if rect.contains(pos):
-                self.selected = cid
-                if e.button() == QtCore.Qt.RightButton:
-                    self._show_context_menu(e.globalPosition().toPoint())
-                    return
-                if isinstance(comp, (SwitchBinary, SwitchTernary)):
-                    comp.toggle()
-                    self.update()
-                    return
-        # port click => start wire
-        for (cid, port), r in self.port_map.items():
-            if r.contains(pos):
-                self.wire_start = (cid, port)
+        if hit is not None:
+            if hit != self.selected:
+                # drags only repaint their own area, so redraw both borders
+                if self.selected in self.circuit.components:
+                    self.update(self._comp_bounds(self.selected).toAlignedRect())
+                self.selected = hit
+                self.update(self._comp_bounds(hit).toAlignedRect())
+            if e.button() == QtCore.Qt.RightButton:
+                self._show_context_menu(e.globalPosition().toPoint())
                 return
-        # start drag
-        for cid, p in self.positions.items():
-            if QtCore.QRectF(p.x(), p.y(), COMP_WIDTH, COMP_HEIGHT).contains(pos):
-                self.dragging = cid
-                self.drag_offset = pos - p
+            comp = self.circuit.components[hit]
+            if comp.is_switch:
+                comp.toggle()
+                self.update()
                 return
+        # port click => start wire
+        ports = self._ports_at(pos)
+        if ports:
+            self.wire_start = ports[0]
+            return
+        # start drag
+        if hit is not None:
+            self.dragging = hit
+            self.drag_offset = pos - self.positions[hit]
+            self._drag_wires = [w for w in self.circuit.wires if hit in (w.src_comp, w.dst_comp)]
+            return
         # empty click clears selection
         self.selected = None
         self.update()
 
     def mouseMoveEvent(self, e: QtGui.QMouseEvent):
         if self.dragging:
+            # repaint only where the component and its wires were and are now
+            dirty = self._comp_bounds(self.dragging) | self._wire_bounds(self._drag_wires)
+            self._unindex_component(self.dragging)
             self.positions[self.dragging] = e.position() - (self.drag_offset or QtCore.QPointF(0, 0))
+            self._index_component(self.dragging)
+            dirty |= self._comp_bounds(self.dragging) | self._wire_bounds(self._drag_wires)
             self.update_extents()
-            self.update()
+            self.update(dirty.toAlignedRect())
+
+    def _rebuild_index(self):
+        """Recompute port hit rects and the hit-testing grids; call after
+        components are added, removed or repositioned so hit-testing never
+        depends on a paint."""
+        self.port_map.clear()
+        self._grid.clear()
+        self._port_grid.clear()
+        for cid in self.circuit.components:
+            self._index_component(cid)
+
+    def _index_component(self, cid: str):
+        for cell in _cells(self._body_rect(cid)):
+            self._grid.setdefault(cell, []).append(cid)
+        for key, r in self._port_rects(cid).items():
+            self.port_map[key] = r
+            for cell in _cells(r):
+                self._port_grid.setdefault(cell, []).append(key)
+
+    def _unindex_component(self, cid: str):
+        # must run before the component's position changes
+        for cell in _cells(self._body_rect(cid)):
+            self._grid[cell].remove(cid)
+        for port in self.circuit.components[cid].ports:
+            r = self.port_map.pop((cid, port))
+            for cell in _cells(r):
+                self._port_grid[cell].remove((cid, port))
+
+    def _body_rect(self, cid: str) -> QtCore.QRectF:
+        pos = self.positions.get(cid, QtCore.QPointF(50, 50))
+        return QtCore.QRectF(pos.x(), pos.y(), COMP_WIDTH, COMP_HEIGHT)
+
+    def _component_at(self, pos: QtCore.QPointF) -> Optional[str]:
+        for cid in self._grid.get(_cell(pos), ()):
+            if self._body_rect(cid).contains(pos):
+                return cid
+        return None
+
+    def _ports_at(self, pos: QtCore.QPointF) -> list[tuple[str, str]]:
+        return [key for key in self._port_grid.get(_cell(pos), ()) if self.port_map[key].contains(pos)]
+
+    def _port_rects(self, cid: str) -> Dict[tuple[str, str], QtCore.QRectF]:
+        comp = self.circuit.components[cid]
+        pos = self.positions.get(cid, QtCore.QPointF(50, 50))
+        rects = {}
+        for i, prt in enumerate(comp.in_ports):
+            rects[(cid, prt.id)] = self._port_rect(pos, i, False)
+        for i, prt in enumerate(comp.out_ports):
+            rects[(cid, prt.id)] = self._port_rect(pos, i, True)
+        return rects
+
+    def _wire_bounds(self, wires) -> QtCore.QRectF:
+        r = QtCore.QRectF()
+        for w in wires:
+            r |= _line_bounds(self.port_center(w.src_comp, w.src_port, True),
+                              self.port_center(w.dst_comp, w.dst_port, False))
+        return r
 
     def mouseReleaseEvent(self, e: QtGui.QMouseEvent):
         if self.dragging:
             self.dragging = None
             self.drag_offset = None
+            self._drag_wires = []
             return
         if self.wire_start:
             s_cid, s_port = self.wire_start
             s_is_out = self.circuit.components[s_cid].ports[s_port].direction == 'out'
-            for (cid, port), r in self.port_map.items():
-                if r.contains(e.position()):
-                    d_is_out = self.circuit.components[cid].ports[port].direction == 'out'
-                    if s_is_out != d_is_out:
-                        if s_is_out:
-                            self.circuit.connect(s_cid, s_port, cid, port)
-                        else:
-                            self.circuit.connect(cid, port, s_cid, s_port)
-                        break
+            for cid, port in self._ports_at(e.position()):
+                d_is_out = self.circuit.components[cid].ports[port].direction == 'out'
+                if s_is_out != d_is_out:
+                    if s_is_out:
+                        self.circuit.connect(s_cid, s_port, cid, port)
+                    else:
+                        self.circuit.connect(cid, port, s_cid, s_port)
+                    break
             self.wire_start = None
             self.update()
 
@@ -293,12 +400,12 @@ class Canvas(QtWidgets.QWidget):
         if not self.selected:
             return
         cid = self.selected
-        self.circuit.wires = [w for w in self.circuit.wires if w.src_comp != cid and w.dst_comp != cid]
-        if cid in self.circuit.components:
-            del self.circuit.components[cid]
+        self.circuit.remove(cid)
+        self._pic_cache.pop(cid, None)
         if cid in self.positions:
             del self.positions[cid]
         self.selected = None
+        self._rebuild_index()
         self.update_extents()
         self.update()
 
@@ -369,6 +476,8 @@ class MainWindow(QtWidgets.QMainWindow):
         super().__init__()
         self.setWindowTitle("Ternuino CPU Designer")
         self.canvas = Canvas()
+        # editor text last applied to or exported from the canvas
+        self._clean_text: Optional[str] = None
         # splitter
         splitter = QtWidgets.QSplitter()
         splitter.setOrientation(QtCore.Qt.Horizontal)
@@ -451,16 +560,21 @@ class MainWindow(QtWidgets.QMainWindow):
         if not self.editor.current_path:
             return self.on_save_as()
         text = self.editor.get_text()
-        try:
-            json.loads(text)
-        except Exception as e:
-            QtWidgets.QMessageBox.critical(self, "Invalid JSON", str(e))
-            self.editor.set_status("Invalid JSON - not saved", ok=False)
-            return
+        # text the canvas was last loaded from (or exported to) is known to be
+        # valid, so write it straight out without re-validating and reloading
+        edited = text != self._clean_text
+        if edited:
+            try:
+                json.loads(text)
+            except Exception as e:
+                QtWidgets.QMessageBox.critical(self, "Invalid JSON", str(e))
+                self.editor.set_status("Invalid JSON - not saved", ok=False)
+                return
         with open(self.editor.current_path, 'w', encoding='utf-8') as f:
             f.write(text)
         self.editor.set_status(f"Saved: {self.editor.current_path}")
-        self._apply_text_to_canvas(text)
+        if edited:
+            self._apply_text_to_canvas(text)
 
     def on_save_as(self):
         path, _ = QtWidgets.QFileDialog.getSaveFileName(self, "Save design as", filter="JSON (*.json)")
@@ -476,6 +590,7 @@ class MainWindow(QtWidgets.QMainWindow):
     def _apply_text_to_canvas(self, text: str):
         try:
             self.canvas.load_json(text)
+            self._clean_text = text
             self.editor.set_status("Applied to canvas", ok=True)
             issues = self.canvas.validate_wiring()
             if issues:
@@ -488,7 +603,7 @@ class MainWindow(QtWidgets.QMainWindow):
 
     def on_export_canvas(self):
         try:
-            base = json.loads(dump_circuit_to_json(self.canvas.circuit))
+            base = dump_circuit_to_dict(self.canvas.circuit)
             for comp in base.get('components', []):
                 cid = comp.get('id')
                 if cid and cid in self.canvas.positions:
@@ -496,6 +611,7 @@ class MainWindow(QtWidgets.QMainWindow):
                     comp['position'] = {'x': int(p.x()), 'y': int(p.y())}
             text = json.dumps(base, indent=2)
             self.editor.set_text(text, self.editor.current_path)
+            self._clean_text = text
             self.editor.set_status("Exported from canvas", ok=True)
         except Exception as e:
             QtWidgets.QMessageBox.critical(self, "Export error", str(e))
@@ -7,7 +7,10 @@ REPO_ROOT = os.path.abspath(os.path.join(THIS_DIR, os.pardir))
 if REPO_ROOT not in sys.path:
     sys.path.insert(0, REPO_ROOT)
 
-from ternuino_designer.core.logic import Circuit, SwitchTernary, TNOR, TAND, TNOT, Transistor, TLatch, Probe
+from ternuino_designer.core import _jit
+from ternuino_designer.core.logic import (
+    Circuit, SwitchTernary, TNOR, TAND, TNOT, Transistor, TLatch, TFullAdder, Probe,
+)
 
 
 def run():
@@ -22,6 +25,8 @@ def run():
 
     for comp in [sw1, sw2, and1, nor1, t1, l1, p1]:
         c.add(comp)
+    # stock components are slotted: no per-instance __dict__
+    assert not any(hasattr(comp, '__dict__') for comp in c.components.values())
 
     # wire similar to sample
     c.connect('sw1', 'out', 'and1', 'in1')
@@ -36,6 +41,14 @@ def run():
     c.connect('nor1', 'out', 'l1', 'in')
     c.connect('sw1', 'out', 'l1', 'enable')
     c.connect('l1', 'out', 'p1', 'in')
+    # netlist is complete: compile once and lock it
+    c.freeze()
+    try:
+        c.connect('sw2', 'out', 'l1', 'in')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('frozen circuit accepted a wire')
 
     # initial step
     c.step()
@@ -48,5 +61,119 @@ def run():
     print('Probe after step 2:', c.get_probe('p1'))
 
 
+def run_sweep():
+    c = Circuit()
+    for comp in [SwitchTernary('a'), SwitchTernary('b'), TNOR('nor1'), TNOT('not1'), Probe('p_nor'), Probe('p_or')]:
+        c.add(comp)
+    c.connect('a', 'out', 'nor1', 'in1')
+    c.connect('b', 'out', 'nor1', 'in2')
+    c.connect('nor1', 'out', 'not1', 'in')
+    c.connect('nor1', 'out', 'p_nor', 'in')
+    c.connect('not1', 'out', 'p_or', 'in')
+
+    # all 9 input pairs in one packed evaluation
+    a = [x for x in (-1, 0, 1) for _ in range(3)]
+    b = [-1, 0, 1] * 3
+    out = c.sweep({'a': a, 'b': b}, ['p_nor', 'p_or'])
+    for i in range(9):
+        assert out[i, 0] == -max(a[i], b[i]) and out[i, 1] == max(a[i], b[i])
+    print('Sweep TNOR(a, b):', out[:, 0].tolist())
+    for uneven in ({'a': [1, 1, 1], 'b': [1]}, {'a': [1], 'b': [1, 1, 1]}):
+        try:
+            c.sweep(uneven, ['p_nor'])
+        except ValueError:
+            pass
+        else:
+            raise AssertionError('sweep() accepted inputs of different lengths')
+
+    # the same patterns as consecutive ticks: acyclic logic settles every step
+    trace = c.run(9, {'a': a, 'b': b}, ['p_nor', 'p_or'])
+    assert (trace == out).all()
+    try:
+        c.run(3, {'a': [1]})
+    except ValueError:
+        pass
+    else:
+        raise AssertionError('run() broadcast a short input')
+
+    # with the step memo on, the second pass is served from the cache
+    c.memo = True
+    c.invalidate()
+    for _ in range(2):
+        assert (c.run(9, {'a': a, 'b': b}, ['p_nor', 'p_or']) == out).all()
+    assert len(c._memo) == 9
+
+
+def build_mixed(loop, **kwargs):
+    c = Circuit(**kwargs)
+    for comp in [SwitchTernary('a'), SwitchTernary('b'), SwitchTernary('e'),
+                 TAND('and1'), TNOT('not1'), TNOR('nor1'), TLatch('l1'),
+                 TFullAdder('fa'), Transistor('t1'), Probe('p_t'), Probe('p_co')]:
+        c.add(comp)
+    c.connect('a', 'out', 'and1', 'in1')
+    c.connect('b', 'out', 'and1', 'in2')
+    # not1.in has two drivers
+    c.connect('a', 'out', 'not1', 'in')
+    c.connect('and1', 'out', 'not1', 'in')
+    c.connect('not1', 'out', 'nor1', 'in1')
+    c.connect('nor1', 'out', 'l1', 'in')
+    c.connect('e', 'out', 'l1', 'enable')
+    c.connect('not1', 'out', 'fa', 'ai')
+    c.connect('b', 'out', 'fa', 'bi')
+    c.connect('l1', 'out', 'fa', 'ci')
+    c.connect('e', 'out', 't1', 'presence')
+    c.connect('fa', 'so', 't1', 'sign')
+    c.connect('t1', 'out', 'p_t', 'in')
+    c.connect('fa', 'co', 'p_co', 'in')
+    if loop:
+        # feedback: nor1 -> l1 -> nor1
+        c.connect('l1', 'out', 'nor1', 'in2')
+    return c
+
+
+def run_modes():
+    # every step implementation must agree tick for tick, with and without
+    # a feedback loop; the Numba ones only when numba is installed. Modes are
+    # (Circuit kwargs, drop the generated step for the per-stage NumPy one).
+    modes = [(dict(jit=False), True), (dict(jit=False), False)]
+    if _jit.step_kernel is not None:
+        modes += [(dict(jit=True), False), (dict(jit=True, incremental=True), False)]
+        _jit.warm_up_parallel()
+    pattern = [(a, b, e) for a in (-1, 0, 1) for b in (-1, 0, 1) for e in (-1, 0, 1)]
+    inputs = {name: [p[i] for p in pattern] for i, name in enumerate('abe')}
+    for loop in (True, False):
+        ref = None
+        for kwargs, staged in modes:
+            c = build_mixed(loop, **kwargs)
+            c.freeze()
+            if not c._use_jit:
+                assert c._py_step is not None
+                if staged:
+                    c._py_step = None
+            if kwargs.get('incremental'):
+                assert (c._events is not None) == (not loop)
+            states = []
+            for values in pattern:
+                for name, v in zip('abe', values):
+                    c.component(name).set_value(v)
+                if c._use_jit and not c.incremental:
+                    # the threaded kernel, forced onto every stage
+                    shadow = c.port_val.copy()
+                    _jit.step_kernel_parallel(shadow, *c._jit_args, 1)
+                c.step()
+                if c._use_jit and not c.incremental:
+                    assert (shadow == c.port_val).all()
+                states.append(c.port_val.copy())
+            trace = c.run(len(pattern), inputs, ['p_t', 'p_co'])
+            if ref is None:
+                ref = states, trace
+                continue
+            assert all((s == r).all() for s, r in zip(states, ref[0])), (loop, kwargs, staged)
+            assert (trace == ref[1]).all(), (loop, kwargs, staged)
+    print('Step modes agree:', len(modes))
+
+
 if __name__ == '__main__':
     run()
+    run_sweep()
+    run_modes()